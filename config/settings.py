@@ -1,3 +1,4 @@
 LOGIN_URL = "https://minasidor.sssb.se/en/login/"
 LISTINGS_URL = "https://minasidor.sssb.se/en/available-apartments/"
-APARTMENT_TYPE_FILTER = "BOASL"  # Options: "All", "BOAS1", "BOASL", "BOASR", where BOAS1 = studio apartment, BOASL = student apartment, BOASR = student room
\ No newline at end of file
+APARTMENT_TYPE_FILTER = "BOASL"  # Options: "All", "BOAS1", "BOASL", "BOASR", where BOAS1 = studio apartment, BOASL = student apartment, BOASR = student room
+APARTMENT_TYPE_FILTERS = [APARTMENT_TYPE_FILTER]  # apartment types scraped on each run, e.g. ["BOAS1", "BOASL"]
@@ -1,6 +1,4 @@
 import pandas as pd
-from datetime import datetime, timedelta
-from plotnine import ggplot, aes, geom_line, geom_point, geom_hline, labs, theme_bw, theme, element_text, scale_color_manual
 import matplotlib.pyplot as plt
 
 # read csv
@@ -16,20 +14,19 @@ def plot_save():
     The plot is saved to `storage/apartment_queue.pdf`.
 
     Steps performed:
-    1. Load the dataset and parse date columns.
-    2. Convert numeric columns (e.g., CreditDays).
-    3. Add Area to the apartment Title for easier identification.
-    4. Filter the data to the last 7 days.
-    5. Generate one color per unique apartment title (max 10 fallback colors).
-    6. Produce a ggplot-style line plot using plotnine.
+    1. Load the plotted columns of the dataset and parse date columns.
+    2. Filter the data to the last 7 days.
+    3. Convert numeric columns (e.g., CreditDays).
+    4. Add Area to the apartment Title for easier identification.
+    5. Assign one color per unique apartment title (max 10 colors).
+    6. Produce a line plot per apartment using matplotlib.
     7. Save the final figure as a PDF.
 
     Notes
     -----
     - If no entries exist within the last 7 days, the function prints a
       message and does not generate a plot.
-    - The color palette uses Matplotlib’s Set2 colormap combined with a fixed
-      fallback palette.
+    - Colors come from a fixed palette of 10 named colors.
     - The PDF is always overwritten.
 
     Output
@@ -39,47 +36,39 @@ def plot_save():
     """
     
     df = pd.read_csv("storage/apartments.csv",
-                    parse_dates=["ConsultationDate", "Moving in"])
+                    usecols=["Title", "Area", "ConsultationDate", "Queue days", "CreditDays"],
+                    parse_dates=["ConsultationDate"],
+                    dtype={"Queue days": "Int32"})
 
-    df["CreditDays"] = pd.to_numeric(df["CreditDays"], errors="coerce")
+    # take only 7 days back, before any per-row work on the full history
 
-    # take only 7 days back
+    cutoff = pd.Timestamp.now() - pd.Timedelta(days=7)
+    df7 = df.loc[df["ConsultationDate"] >= cutoff].copy()
 
-    seven_days_ago = datetime.now() - timedelta(days=7)
-    df['Title'] = df['Title'] + ' ' + df['Area']
-
-
-    df7 = df[df["ConsultationDate"] >= seven_days_ago]   
+    df7["CreditDays"] = pd.to_numeric(df7["CreditDays"], errors="coerce")
+    df7["Title"] = df7["Title"].str.cat(df7["Area"], sep=" ")
 
 
     # set nice colors
 
-    cmap = plt.get_cmap("Set2")
     titles = df7['Title'].unique()
     num_colors = len(titles)
-    colors = [cmap(i / num_colors) for i in range(num_colors)]
     color_mapping = dict(zip(titles, ["red","blue","green","orange","purple","brown","pink","gray","olive","cyan"][:num_colors]))
     if df7.empty:
         print("No data from the last 7 days to plot.")
     else:
         # Create plot
-        p = (ggplot(df7, aes(x="ConsultationDate", 
-                            y="Queue days", 
-                            color="Title"))
-            + geom_line()
-            + geom_point()
-            + geom_hline(aes(yintercept="CreditDays"), 
-                        linetype="dashed", 
-                        color="red")
-            + labs(
-                x="Date of scraping",
-                y="Queue days"
-            )
-            + theme_bw() 
-            + scale_color_manual(values=color_mapping) 
-            + theme(axis_text_x=element_text(rotation=45, hjust=1))
-        )
-
-
-
-    p.save("storage/apartment_queue.pdf", width=8, height=6)
+        fig, ax = plt.subplots(figsize=(8, 6))
+        for title, grp in df7.sort_values("ConsultationDate").groupby("Title"):
+            ax.plot(grp["ConsultationDate"], grp["Queue days"], marker="o",
+                    label=title, color=color_mapping.get(title))
+        for credit_days in df7["CreditDays"].dropna().unique():
+            ax.axhline(credit_days, linestyle="--", color="red")
+        ax.set_xlabel("Date of scraping")
+        ax.set_ylabel("Queue days")
+        ax.grid(True, alpha=0.3)
+        ax.legend(title="Title")
+        fig.autofmt_xdate(rotation=45)
+
+        fig.savefig("storage/apartment_queue.pdf", bbox_inches="tight")
+        plt.close(fig)
@@ -1,42 +1,436 @@
-from config.settings import LISTINGS_URL, APARTMENT_TYPE_FILTER, LOGIN_URL
+from config.settings import LISTINGS_URL, APARTMENT_TYPE_FILTERS, LOGIN_URL
 from dotenv import load_dotenv
 import os
 import csv
+import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from selenium import webdriver  
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support.ui import Select, WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import InvalidCookieDomainException, TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+import mechanicalsoup
+import requests
 import re
+import shutil
+import threading
 load_dotenv()
 
+# Load credentials and driver settings from environment variables once per process
+_USERNAME = os.getenv("USERNAME")
+_PASSWORD = os.getenv("PASSWORD")
+_HUB_URL = os.getenv("SELENIUM_HUB_URL")
+_USE_BROWSER = os.getenv("USE_BROWSER", "").lower() in ("1", "true", "yes")
+
+# strips the applicant count from queue strings such as '787 (14st)'
+_QUEUE_PAREN_RE = re.compile(r"\s*\(.*\)")
+
+# removes the non-breaking spaces used as thousands separators in rents
+_NBSP_TABLE = str.maketrans('', '', '\xa0')
+
+# column order of storage/apartments.csv; the first six columns follow the
+# order of the values in each listing's detail list
+_FIELDNAMES = ("Area", "Living space", "Rent", "Moving in", "Queue days", "Floor",
+               "Title", "Address", "ConsultationDate", "CreditDays")
+
+
+def _has_class(name):
+    """XPath predicate matching elements whose class list contains `name`."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# login cookies and dashboard URL saved between runs to skip the login form
+_COOKIE_FILE = "storage/.cookies.json"
+_COOKIE_LOCK = threading.Lock()
+_COOKIE_KEYS = ("name", "value", "domain", "path")
+
+# the user's credit days inside the dashboard widget; waiting on the <strong>
+# itself matters because eager page loads can return before it is filled in
+_CREDIT_DAYS_LOCATOR = (By.CSS_SELECTOR, 'div[data-widget="koerochprenumerationer@STD"] strong')
+
+# static assets the scraper never reads, blocked at the network layer in Chrome
+_BLOCKED_URLS = ["*.jpg", "*.jpeg", "*.png", "*.webp", "*.gif", "*.svg",
+                 "*.woff", "*.woff2", "*.ttf", "*.mp4", "*.css"]
+
+# Chrome options shared by every driver: headless, small viewport, no images,
+# stylesheets, fonts or extensions, and `driver.get` returning at DOMContentLoaded
+_OPTIONS = webdriver.ChromeOptions()
+_OPTIONS.add_argument("--headless=new")
+_OPTIONS.add_argument("--disable-gpu")
+_OPTIONS.add_argument("--window-size=1024,768")
+_OPTIONS.add_argument("--blink-settings=imagesEnabled=false")
+_OPTIONS.add_argument("--disable-extensions")
+_OPTIONS.add_experimental_option("prefs", {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.managed_default_content_settings.stylesheets": 2,
+    "profile.managed_default_content_settings.fonts": 2,
+})
+_OPTIONS.page_load_strategy = "eager"
+
+# chromedriver path, resolved once per process (or pinned with CHROMEDRIVER / PATH)
+_DRIVER_PATH = None
+_DRIVER_LOCK = threading.Lock()
+
+# XPath expressions compiled once and reused for every apartment
+_CREDIT_DAYS_XP = etree.XPath("//div[@data-widget='koerochprenumerationer@STD']//strong")
+_APT_XP = etree.XPath("//div[@id='apartmentList']//div[@class='appartment row']")
+# also matches the empty <li> the detail list contains because of its structure;
+# it can hold a lone &nbsp;, which normalize-space() keeps, so it is dropped
+# after str.strip() in _extract_apartments
+_DAT_XP = etree.XPath(f".//*[{_has_class('apt-details-data')}]//li")
+_TITLE_XP = etree.XPath(f".//*[{_has_class('apt-title')}]//a")
+_ADDR_XP = etree.XPath(f".//*[{_has_class('apt-address')}]")
+
+# browser-side counterpart of _extract_apartments, run against #apartmentList
+_EXTRACT_APARTMENTS_JS = """
+const text = el => el ? el.textContent.trim() : '';
+return Array.from(arguments[0].querySelectorAll('div.appartment.row'), apt => ({
+    data: Array.from(apt.querySelectorAll('.apt-details-data li:not(:empty)'), text).filter(Boolean),
+    title: text(apt.querySelector('.apt-title a')),
+    address: text(apt.querySelector('.apt-address')),
+}));
+"""
+
+_local = threading.local()
+
+
+def _parse_html(page_source):
+    """Parse `page_source` with a parser owned by the calling thread.
+
+    lxml serializes parse calls that share the default global parser, so
+    each thread lazily builds its own HTMLParser instead.
+    """
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = lxml_html.HTMLParser()
+    return lxml_html.fromstring(page_source, parser=parser)
+
+
+def _extract_apartments(listings_html):
+    """
+    Extract the raw fields of every apartment on a listings page.
+
+    Returns
+    -------
+    list of dict
+        One dict per apartment with the non-empty `data` values of its detail
+        list, plus its `title` and `address` ("" when missing).
+    """
+    apartments = []
+    for apt in _APT_XP(_parse_html(listings_html)):
+        data = [li.text_content().strip() for li in _DAT_XP(apt)]
+        title_elem = _TITLE_XP(apt)
+        address_elem = _ADDR_XP(apt)
+        apartments.append({
+            "data": [x for x in data if x != ''],  # remove empty entry because of structure
+            "title": title_elem[0].text_content().strip() if title_elem else "",
+            "address": address_elem[0].text_content().strip() if address_elem else "",
+        })
+    return apartments
+
+
+def _read_credit_days(dashboard_html):
+    """Return the credit days shown on a dashboard page, or None if the widget has none."""
+    strong = _CREDIT_DAYS_XP(_parse_html(dashboard_html))
+    return (strong[0].text_content().strip() or None) if strong else None
+
+
+def _extract_row(apt, consultation_date, credit_days):
+    """
+    Clean up one apartment returned by the fetchers and lay it out as a CSV row.
+
+    Returns
+    -------
+    list
+        The apartment's values in `_FIELDNAMES` order.
+    """
+    data = apt["data"]
+    return [data[0], data[1],
+            data[2].translate(_NBSP_TABLE),  # Clean up non-breaking spaces in rent
+            data[3],
+            int(_QUEUE_PAREN_RE.sub("", data[4])),  # Keep only queueing days number
+            data[5],
+            apt["title"], apt["address"], consultation_date, credit_days]
+
+
+def _load_cookies(username):
+    """
+    Load the login cookies saved by a previous run for `username`.
+
+    Returns
+    -------
+    dict or None
+        The `dashboard_url` and `cookies` (dicts with name, value, domain and
+        path) from `_COOKIE_FILE`, or None if nothing usable was saved or the
+        cookies belong to another account.
+    """
+    try:
+        with open(_COOKIE_FILE, encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):  # missing or unreadable file, bad UTF-8 or JSON
+        return None
+
+    # ignore files written in any other shape, e.g. a bare list of cookies, and
+    # sessions of another account so a changed USERNAME logs in again
+    if not (isinstance(saved, dict)
+            and saved.get("username") == username
+            and isinstance(saved.get("dashboard_url"), str)
+            and isinstance(saved.get("cookies"), list)
+            and all(isinstance(c, dict)
+                    and all(isinstance(c.get(k), str) for k in _COOKIE_KEYS)
+                    for c in saved["cookies"])):
+        return None
+    return saved
+
+
+def _save_cookies(cookies, dashboard_url, username):
+    """
+    Save login cookies (dicts with name, value, domain and path), the dashboard
+    URL and the `username` they were issued to.
+
+    The file holds a live session, so it is only readable by its owner.
+    """
+    saved = {
+        "username": username,
+        "dashboard_url": dashboard_url,
+        "cookies": [{k: c[k] for k in _COOKIE_KEYS} for c in cookies
+                    if all(isinstance(c.get(k), str) for k in _COOKIE_KEYS)],
+    }
+    with _COOKIE_LOCK:
+        os.makedirs(os.path.dirname(_COOKIE_FILE), exist_ok=True)
+        fd = os.open(_COOKIE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.fchmod(fd, 0o600)  # also tighten a file created by an older run
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(saved, f)
+
+
+def _fetch_http(username, password, apartment_type):
+    """
+    Log into SSSB and fetch the listings page over plain HTTP.
+
+    Cookies saved by a previous run are reused when they still open the
+    dashboard; otherwise the login form is submitted with mechanicalsoup and
+    the new cookies are saved. The listings are filtered by filling in and
+    submitting the page's search form, skipping the Chrome startup and
+    per-element WebDriver round-trips entirely.
+
+    Returns
+    -------
+    tuple of (str, list of dict) or None
+        The user's credit days and the apartments from `_extract_apartments`,
+        or None if the login failed, a page came back empty, the dashboard
+        shows no credit days, the search form could not be filled in or the
+        listings page has no server-rendered apartments.
+    """
+    browser = mechanicalsoup.StatefulBrowser()
+    try:
+        credit_days = None
+        saved = _load_cookies(username)
+        if saved is not None:
+            for c in saved["cookies"]:
+                browser.session.cookies.set(c["name"], c["value"], domain=c["domain"], path=c["path"])
+            dashboard = browser.session.get(saved["dashboard_url"], timeout=15)
+            credit_days = _read_credit_days(dashboard.text)
+            if credit_days is None:
+                # the saved login has expired
+                browser.session.cookies.clear()
+
+        if credit_days is None:
+            browser.open(LOGIN_URL, timeout=15)
+            browser.select_form('form:has(input[name="log"])')
+            browser["log"] = username
+            browser["pwd"] = password
+            dashboard = browser.submit_selected(timeout=15)
+            credit_days = _read_credit_days(dashboard.text)
+            if credit_days is None:
+                return None
+            _save_cookies([{"name": c.name, "value": c.value, "domain": c.domain, "path": c.path}
+                           for c in browser.session.cookies], dashboard.url, username)
+
+        # apply the filter by submitting the search form, as in the browser
+        browser.open(LISTINGS_URL, timeout=15)
+        form = browser.select_form('form:has(#oboTyper)')
+        if apartment_type != "All":
+            field_name = form.form.select_one("#oboTyper").get("name")
+            if not field_name:
+                return None
+            form.set_select({field_name: apartment_type})
+        search_button = form.form.select_one("input.btn.Sok")
+        if search_button is not None:
+            form.choose_submit(search_button)
+        listings = browser.submit_selected(timeout=15)
+        apartments = _extract_apartments(listings.text)
+    except (mechanicalsoup.LinkNotFoundError, requests.RequestException, etree.ParserError):
+        # etree.ParserError: lxml cannot parse an empty or whitespace-only body
+        return None
+    finally:
+        browser.close()
+
+    if not apartments:
+        return None
+    return credit_days, apartments
+
+
+def _create_driver():
+    """
+    Create a Chrome WebDriver tuned for scraping rather than viewing.
+
+    Drivers share the module-level `_OPTIONS`; the explicit waits on the login
+    and listing elements still guarantee each page is ready even though
+    `driver.get` returns at DOMContentLoaded.
+
+    If the SELENIUM_HUB_URL environment variable is set, the browser is
+    requested from that Selenium Grid hub. Otherwise a local Chrome is started
+    and static assets are also blocked through the DevTools protocol; the
+    chromedriver path is taken from the CHROMEDRIVER environment variable or a
+    chromedriver on PATH when available, otherwise it is resolved with
+    ChromeDriverManager once and reused.
+    """
+    global _DRIVER_PATH
+
+    if _HUB_URL:
+        return webdriver.Remote(command_executor=_HUB_URL, options=_OPTIONS)
+
+    # parallel scrapes may get here together; resolve the path only once
+    with _DRIVER_LOCK:
+        if _DRIVER_PATH is None:
+            _DRIVER_PATH = (os.getenv("CHROMEDRIVER") or shutil.which("chromedriver")
+                            or ChromeDriverManager().install())
+
+    driver = webdriver.Chrome(service=Service(_DRIVER_PATH), options=_OPTIONS)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": _BLOCKED_URLS})
+    return driver
+
+
+def _fetch_browser(username, password, apartment_type):
+    """
+    Log into SSSB and fetch the listings page with a Chrome WebDriver.
 
-def scrape_listings():
+    Fallback for when the listings are rendered client-side: the search form
+    is filled in and submitted in the browser. Saved login cookies are reused
+    the same way as in `_fetch_http`. The credit days and the apartments are
+    each read inside Chrome with a single `execute_script` call, so no page
+    is serialized and re-parsed in Python.
+
+    Returns
+    -------
+    tuple of (str, list of dict)
+        The user's credit days and the apartments, shaped like the output of
+        `_extract_apartments`.
+    """
+    driver = _create_driver()
+    try:
+        wait = WebDriverWait(driver, 15)
+
+        credit_days_elem = None
+        saved = _load_cookies(username)
+        if saved is not None:
+            # open the site first so the cookies can be set for its domain
+            driver.get(LISTINGS_URL)
+            for cookie in saved["cookies"]:
+                try:
+                    driver.add_cookie(cookie)
+                except InvalidCookieDomainException:
+                    # picked up on a redirect to another host; the dashboard check
+                    # below falls through to the credential login if it was needed
+                    continue
+            driver.get(saved["dashboard_url"])
+            try:
+                # an expired login lands on the login form instead of the dashboard
+                wait.until(EC.any_of(EC.presence_of_element_located(_CREDIT_DAYS_LOCATOR),
+                                     EC.presence_of_element_located((By.NAME, "log"))))
+            except TimeoutException:
+                pass
+            credit_days_elem = next(iter(driver.find_elements(*_CREDIT_DAYS_LOCATOR)), None)
+
+        if credit_days_elem is None:
+            driver.get(LOGIN_URL)
+
+            wait.until(EC.presence_of_element_located((By.NAME, "log")))
+            driver.find_element(By.NAME, "log").send_keys(username)
+            driver.find_element(By.NAME, "pwd").send_keys(password)  # change ID if needed
+            driver.find_element(By.XPATH, "//button[text()='Log in']").click()
+
+            # recover the queuing days once the dashboard has loaded
+            credit_days_elem = wait.until(EC.presence_of_element_located(_CREDIT_DAYS_LOCATOR))
+            _save_cookies(driver.get_cookies(), driver.current_url, username)
+
+        credit_days = driver.execute_script(
+            "return arguments[0].textContent.trim();", credit_days_elem)
+
+        # go to listings
+
+        driver.get(LISTINGS_URL)
+
+        # filter by apartment type if needed
+
+        if apartment_type != "All":
+            select = wait.until(EC.presence_of_element_located((By.ID, "oboTyper")))
+            Select(select).select_by_value(apartment_type)
+
+        # Wait until the search button is clickable, then click it
+        search_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input.btn.Sok")))
+        search_button.click()
+
+        # wait for apartments to load
+        apartment_list = wait.until(EC.presence_of_element_located((By.ID, "apartmentList")))
+
+        return credit_days, driver.execute_script(_EXTRACT_APARTMENTS_JS, apartment_list)
+    finally:
+        driver.quit()
+
+
+def _fetch(apartment_type):
+    """
+    Fetch the credit days and apartments for one apartment type.
+
+    Plain HTTP is tried first and Chrome is only launched if that fails or
+    finds no apartments, unless the USE_BROWSER environment variable asks for
+    the browser directly.
+    """
+    pages = None if _USE_BROWSER else _fetch_http(_USERNAME, _PASSWORD, apartment_type)
+    if pages is None:
+        pages = _fetch_browser(_USERNAME, _PASSWORD, apartment_type)
+    return pages
+
+
+def scrape_listings(apartment_types=None):
     """
     Log into SSSB, scrape available apartment listings, extract queue information,
     and append the results to `storage/apartments.csv`.
 
-    This function uses Selenium to authenticate to the SSSB portal using credentials
-    stored in environment variables. After logging in, it retrieves the user's current
+    This function authenticates to the SSSB portal using credentials stored in
+    environment variables, over plain HTTP when the listings are server-rendered
+    and with Selenium otherwise. After logging in, it retrieves the user's current
     credit days, navigates to the apartment listings page, applies filtering,
     loads all available apartments, and extracts structured details from each listing.
     Results are appended to a persistent CSV, creating a longitudinal dataset.
 
+    Parameters
+    ----------
+    apartment_types : sequence of str, optional
+        Apartment-type filters to scrape ("All", "BOAS1", "BOASL", "BOASR").
+        Each type is scraped concurrently in its own worker and the results
+        are written to the CSV together; repeated types are scraped once.
+        Defaults to `APARTMENT_TYPE_FILTERS`.
+
     Steps Performed
     ---------------
-    1. Load login credentials from environment variables.
-    2. Launch a Chrome WebDriver instance and authenticate.
-    3. Parse the logged-in dashboard to extract the user's credit days.
-    4. Navigate to the apartment listings page and apply apartment-type filters.
-    5. Wait for listings to load and parse the final HTML with BeautifulSoup.
-    6. For each apartment:
-        - Extract attribute headers and values
-        - Clean rent amounts and queue-day formats
-        - Capture title, address, consultation date, and credit days
-    7. Append structured results to `storage/apartments.csv`.
+    1. For each apartment type, authenticate with the credentials loaded from
+       environment variables at import time and fetch the filtered listings
+       over HTTP, extracting each apartment's values, title and address
+       with lxml; if the listings page needs JavaScript, launch a
+       Chrome WebDriver instance and extract the same fields in the browser
+       instead.
+    2. Read the user's credit days from the logged-in dashboard.
+    3. For each apartment, clean rent amounts and queue-day formats and add the
+       consultation date and credit days.
+    4. Once every row is built, append them to `storage/apartments.csv`.
        The header row is written only if the file is new or empty.
 
     Output File
@@ -60,115 +454,62 @@ def scrape_listings():
     - Queue days strings like '787 (14st)' are cleaned to retain only the numeric value.
     - Rent values have non-breaking spaces removed.
     - ConsultationDate is stored as a YYYY-MM-DD string.
-    - The function must be run in an environment where Selenium and ChromeDriver are available.
+    - Selenium and ChromeDriver are only needed when the HTTP fetch falls back to the browser.
+    - Login cookies are kept in `storage/.cookies.json` so later runs can skip
+      the login form until they expire.
+    - Set USE_BROWSER=1 to skip the HTTP attempt and always use the browser.
+    - Set SELENIUM_HUB_URL to run the browser fallback on a Selenium Grid hub.
 
     Returns
     -------
     None
         Writes data to CSV as a side effect.
-    """
-        
-    # Load credentials from environment variables
-    USERNAME = os.getenv("USERNAME")
-    PASSWORD = os.getenv("PASSWORD")
-
-    options = webdriver.ChromeOptions()
-    options.add_argument("--start-maximized")  # visible browser
-
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    wait = WebDriverWait(driver, 15)
-
-    driver.get(LOGIN_URL)
-
-    wait.until(EC.presence_of_element_located((By.NAME, "log")))
-    driver.find_element(By.NAME, "log").send_keys(USERNAME)
-    driver.find_element(By.NAME, "pwd").send_keys(PASSWORD)  # change ID if needed
-    driver.find_element(By.XPATH, "//button[text()='Log in']").click()
-
-
-    # recover my queuing days for the day of consulting
-
-    soup = BeautifulSoup(driver.page_source, "lxml")
-    membership_div = soup.find("div", {"data-widget": "koerochprenumerationer@STD"})
-    credit_days = membership_div.find("strong").get_text(strip=True)# go to listings
-
-    driver.get(LISTINGS_URL)
-
-    # filter by apartment type if needed
-
-    if APARTMENT_TYPE_FILTER != "All":
-        select = wait.until(EC.presence_of_element_located((By.ID, "oboTyper")))
-        for option in select.find_elements(By.TAG_NAME, "option"):
-            if option.get_attribute("value") == APARTMENT_TYPE_FILTER:
-                option.click()
-                break
-
-    wait = WebDriverWait(driver, 15)  # wait up to 15 seconds
-
-    # Wait until the search button is clickable, then click it
-    search_button = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "input.btn.Sok")))
-    search_button.click()
-
-
-
-
-    # list appartments and their details
-
-    # wait for apartments to load
-    wait.until(EC.presence_of_element_located((By.ID, "apartmentList")))
-
-
-    # Parse the html of the rendered page
-
-    soup = BeautifulSoup(driver.page_source, "lxml")
-
-    # Find the container with all apartments
-    apartment_list = soup.find("div", id="apartmentList")
-    apartments = apartment_list.find_all("div", class_="appartment row")
-
-    all_apartments = []
-    consultation_date = datetime.now().strftime("%Y-%m-%d")  
-    # iterate over apartments and extract details
-
-    for apt in apartments:
-        # Extract headers and corresponding data
-        headers = [li.get_text(strip=True).rstrip(':') for li in apt.select(".apt-details-headers li")]
-        data = [li.get_text(strip=True) for li in apt.select(".apt-details-data li")]
-        data = [x for x in data if x != ''] # remove empty entry because of structure
-        data[2] = data[2].replace('\xa0', '')  # Clean up non-breaking spaces in rent
-        data[4] = int(re.sub(r"\s*\(.*\)", "",data[4]))  # Keep only queueing days number
-
-        # Convert to dict
-        apartment_info = dict(zip(headers, data))
-        
-        # Optionally, add title and address
-        title_elem = apt.select_one(".apt-title a")
-        apartment_info["Title"] = title_elem.get_text(strip=True) if title_elem else ""
-        
-        address_elem = apt.select_one(".apt-address")
-        apartment_info["Address"] = address_elem.get_text(strip=True) if address_elem else ""
-        
-        apartment_info["ConsultationDate"] = consultation_date
-        apartment_info["CreditDays"] = credit_days
-        all_apartments.append(apartment_info)
 
+    Raises
+    ------
+    ValueError
+        If `apartment_types` is a single string or empty.
+    """
+    if apartment_types is None:
+        apartment_types = APARTMENT_TYPE_FILTERS
+    if isinstance(apartment_types, str) or not apartment_types:
+        raise ValueError("apartment_types must be a non-empty sequence of apartment types, "
+                         f"e.g. ['BOASL'], got {apartment_types!r}")
+    # scrape each type once even if it is listed twice, keeping the given order
+    apartment_types = list(dict.fromkeys(apartment_types))
+
+    # recover the listings and my queuing days for the day of consulting,
+    # one worker per apartment type
+    with ThreadPoolExecutor(max_workers=len(apartment_types)) as executor:
+        results = list(executor.map(_fetch, apartment_types))
+
+    credit_days = results[0][0]
+    consultation_date = datetime.now().strftime("%Y-%m-%d")
+
+    # clean up every apartment before touching the csv, so a malformed listing
+    # fails the run without appending a partial day to the dataset
+    rows = [_extract_row(apt, consultation_date, credit_days)
+            for _, apartments in results for apt in apartments]
 
     # save in csv
 
     filename = "storage/apartments.csv"
 
     # Make sure there is at least one apartment
-    if all_apartments:
-        # Get all keys (columns) from the first dict
-        fieldnames = all_apartments[0].keys()
-        
-        # Check if the file exists and is empty
-        file_exists = os.path.exists(filename)
-        write_header = not file_exists or os.path.getsize(filename) == 0
-
-        with open(filename, mode="a", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+    if rows:
+        # Check if the file exists and is empty, creating storage/ if needed
+        try:
+            write_header = os.stat(filename).st_size == 0
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            write_header = True
+
+        with open(filename, mode="a", newline="", encoding="utf-8", buffering=1 << 16) as csvfile:
+            writer = csv.writer(csvfile)
             if write_header:
-                writer.writeheader()  # write column headers only if file is new/empty
-            for apt in all_apartments:
-                writer.writerow(apt)
+                writer.writerow(_FIELDNAMES)  # write column headers only if file is new/empty
+            writer.writerows(rows)
+
+            # make sure the appended rows reach the disk before returning
+            csvfile.flush()
+            os.fsync(csvfile.fileno())